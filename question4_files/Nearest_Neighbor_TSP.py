@@ -4,31 +4,58 @@
 # - Repeatedly go to the nearest unvisited node.
 # - Return to start and report the tour cost.
 # - Simple O(n^2) baseline for dense graphs.
+# - best_nearest_neighbor_cost tries every start and keeps the cheapest tour.
+
+
+try:
+    import question4_files._kernels as K
+except ModuleNotFoundError:
+    import _kernels as K
+
+
+def _tour_cost(c):
+    # Kernel result -> int, raising where the walk got stuck (K.NO_TOUR).
+    if c == K.NO_TOUR:
+        raise ValueError("nearest-neighbour walk got stuck: no unvisited node "
+                         "is reachable over a positive-weight edge")
+    return int(c)
 
 
 def nearest_neighbor_cost(cost, start=0):
-    # Nearest-neighbour heuristic (dense O(n^2)).
-    n = len(cost)
-    visited = [False] * n
-    order = [start]
-    visited[start] = True
-    curr = start
-
-    for _ in range(n - 1):
-        nxt = None
-        best = float("inf")
-        # Scan all unvisited nodes; pick the closest
-        for v in range(n):
-            if not visited[v] and 0 < cost[curr][v] < best:
-                best = cost[curr][v]
-                nxt = v
-        order.append(nxt)
-        visited[nxt] = True
-        curr = nxt
-
-    # Sum edges along the path + return-to-start edge
-    total = 0
-    for i in range(n - 1):
-        total += cost[order[i]][order[i + 1]]
-    total += cost[order[-1]][order[0]]
-    return total
+    # Nearest-neighbour heuristic (dense O(n^2)), compiled in _kernels.py.
+    # Large graphs scan each row across all threads.
+    g = K.as_cost_matrix(cost)
+    if g.shape[0] >= K.PARALLEL_MIN_N:
+        return _tour_cost(K.nearest_neighbor_cost_par(g, start))
+    return _tour_cost(K.nearest_neighbor_cost(g, start))
+
+
+# prepare() once per graph, then run() as often as needed: run() skips the
+# input conversion, so repeated timings measure only the algorithm.
+def prepare(cost):
+    # One-off cost: the C-contiguous int16/int32 matrix the kernels read.
+    return K.as_cost_matrix(cost)
+
+
+def run(prep, start=0):
+    # nearest_neighbor_cost on a prepare()d matrix.
+    if prep.shape[0] >= K.PARALLEL_MIN_N:
+        return _tour_cost(K.nearest_neighbor_cost_par(prep, start))
+    return _tour_cost(K.nearest_neighbor_cost(prep, start))
+
+
+def best_nearest_neighbor_cost(cost):
+    # Multi-start nearest-neighbour: best tour over all start nodes, the same
+    # as the minimum of nearest_neighbor_cost(cost, s) over every s.
+    # Each row's neighbours are sorted once, so every start only skips
+    # visited neighbours; the starts run in parallel. The sorted table
+    # (neighbor_order) is n x n int32: 400 MB at n = 10000.
+    # Brute_Force_TSP uses the same kernel for its pruning bound.
+    g = K.as_cost_matrix(cost)
+    return _tour_cost(K.nearest_neighbor_multistart(g, K.neighbor_order(g)))
+
+
+# Compiled entry points (int16/int32 cost matrix in) for code that calls the
+# heuristic many times: these skip the Python wrapper above (serial scan only).
+nn_cost_nb = K.nearest_neighbor_cost              # nn_cost_nb(g, start) -> tour cost (or K.NO_TOUR)
+nn_cost_repeat_nb = K.repeat_nearest_neighbor     # nn_cost_repeat_nb(g, runs) -> last cost (start 0)
@@ -0,0 +1,438 @@
+# Numba-compiled kernels shared by the TSP algorithm files.
+
+# - Each kernel takes a C-contiguous int16 or int32 cost matrix (see
+#   as_cost_matrix); sums and keys are accumulated in int64.
+# - Compiled code is cached on disk, and every kernel is warmed up once at
+#   import so the first timed call does not pay the JIT cost.
+# - Serial kernels release the GIL (nogil), so Python threads can run them
+#   concurrently. The parallel ones must not be called from several threads
+#   at once: Numba's default thread pool is not re-entrant.
+
+import sys
+
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+# This file is imported both as "question4_files._kernels" and as "_kernels"
+# (see the import fallbacks in the algorithm files). Numba's disk cache records
+# the importing module's name, so register both names for one module object
+# and cached kernels load whichever way the file was reached.
+sys.modules.setdefault("_kernels", sys.modules[__name__])
+sys.modules.setdefault("question4_files._kernels", sys.modules[__name__])
+
+COST_DTYPE = np.int32
+COST_DTYPES = (np.int16, np.int32)  # matrix dtypes the kernels take as they are
+INF = np.iinfo(np.int64).max
+# Returned by the nearest-neighbour kernels when the walk gets stuck: no
+# unvisited vertex is reachable over a positive edge (tour costs are >= 0).
+NO_TOUR = -1
+PARALLEL_MIN_N = 2048  # below this, thread fork/join costs more than the scan
+
+
+def as_cost_matrix(cost):
+    # Any 2-D cost (list-of-lists or ndarray) → C-contiguous matrix: int16/int32
+    # arrays keep their dtype (no copy if already contiguous), the rest become COST_DTYPE.
+    if isinstance(cost, np.ndarray) and cost.dtype in COST_DTYPES:
+        return np.ascontiguousarray(cost)
+    return np.ascontiguousarray(cost, dtype=COST_DTYPE)
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def prim_mst_parent(cost):
+    # Prim's MST (dense O(n^2)) → parent array (parent[0] = -1).
+    # Relaxing u's row and picking the next cheapest vertex share one pass
+    # over the contiguous row, so key/parent are streamed once per vertex added.
+    n = cost.shape[0]
+    in_mst = np.zeros(n, np.bool_)
+    key = np.full(n, INF, np.int64)
+    parent = np.full(n, -1, np.int32)
+    key[0] = 0
+
+    u = 0
+    for _ in range(n):
+        in_mst[u] = True
+        row = cost[u]
+        nxt = -1
+        best = INF
+        for v in range(n):
+            if in_mst[v]:
+                continue
+            # Relax edge (u, v), then consider v for the next pick
+            w = row[v]
+            k = key[v]
+            if 0 < w and w < k:
+                k = w
+                key[v] = w
+                parent[v] = u
+            if k < best:
+                best = k
+                nxt = v
+        if nxt == -1:
+            break
+        u = nxt
+    return parent
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def mst_csr(parent):
+    # Undirected MST adjacency in CSR form from parent[]: the neighbours of u
+    # are indices[indptr[u]:indptr[u + 1]], sorted ascending.
+    n = parent.shape[0]
+    deg = np.zeros(n + 1, np.int32)
+    for v in range(n):
+        u = parent[v]
+        if u != -1:
+            deg[u + 1] += 1
+            deg[v + 1] += 1
+    indptr = np.cumsum(deg).astype(np.int32)
+    fill = indptr[:-1].copy()
+    indices = np.empty(indptr[n], np.int32)
+    for v in range(n):
+        u = parent[v]
+        if u != -1:
+            indices[fill[u]] = v
+            fill[u] += 1
+            indices[fill[v]] = u
+            fill[v] += 1
+    for u in range(n):
+        indices[indptr[u]:indptr[u + 1]].sort()
+    return indptr, indices
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def preorder_csr(indptr, indices, start):
+    # Iterative DFS preorder over a CSR tree; each vertex appears exactly once
+    # and smaller-index neighbours are visited first.
+    n = indptr.shape[0] - 1
+    visited = np.zeros(n, np.bool_)
+    order = np.empty(n, np.int32)
+    stack = np.empty(2 * n, np.int32)  # at most 1 + (number of directed edges) pushes
+    top = 0
+    count = 0
+    stack[top] = start
+    top += 1
+    while top > 0:
+        top -= 1
+        u = stack[top]
+        if visited[u]:
+            continue
+        visited[u] = True
+        order[count] = u
+        count += 1
+        # Push in reverse order so smaller indices pop first
+        for j in range(indptr[u + 1] - 1, indptr[u] - 1, -1):
+            v = indices[j]
+            if not visited[v]:
+                stack[top] = v
+                top += 1
+    return order[:count]
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def tour_cost(cost, order):
+    # Cycle cost through 'order' and back to the start node.
+    total = 0
+    for i in range(order.shape[0] - 1):
+        total += cost[order[i], order[i + 1]]
+    total += cost[order[-1], order[0]]
+    return total
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def approx_tsp_cost(cost):
+    # Double-tree 2-approx tour cost (MST preorder from node 0) in one call.
+    return tour_cost(cost, preorder_csr(*mst_csr(prim_mst_parent(cost)), 0))
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def nearest_neighbor_cost(cost, start):
+    # Nearest-neighbour tour cost from 'start' (dense O(n^2)), or NO_TOUR.
+    n = cost.shape[0]
+    visited = np.zeros(n, np.bool_)
+    visited[start] = True
+    curr = start
+    total = 0
+
+    for _ in range(n - 1):
+        nxt = -1
+        best = INF
+        for v in range(n):
+            w = cost[curr, v]
+            if not visited[v] and 0 < w and w < best:
+                best = w
+                nxt = v
+        if nxt == -1:
+            return NO_TOUR
+        total += best
+        visited[nxt] = True
+        curr = nxt
+
+    # Return-to-start edge
+    total += cost[curr, start]
+    return total
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def _nearest_neighbor_cost_par(cost, start, n_chunks):
+    # Same tour as nearest_neighbor_cost; each step's scan is split into
+    # n_chunks contiguous slices (one per thread), then the per-slice minima
+    # are reduced in slice order (so ties still go to the smallest index).
+    n = cost.shape[0]
+    n_chunks = max(1, min(n_chunks, n))
+    chunk = (n + n_chunks - 1) // n_chunks
+    local_best = np.empty(n_chunks, np.int64)
+    local_idx = np.empty(n_chunks, np.int64)
+    visited = np.zeros(n, np.bool_)
+    visited[start] = True
+    curr = start
+    total = 0
+
+    for _ in range(n - 1):
+        for c in prange(n_chunks):
+            lo = c * chunk
+            hi = min(lo + chunk, n)
+            b = INF
+            bi = -1
+            for v in range(lo, hi):
+                w = cost[curr, v]
+                if not visited[v] and 0 < w and w < b:
+                    b = w
+                    bi = v
+            local_best[c] = b
+            local_idx[c] = bi
+
+        nxt = -1
+        best = INF
+        for c in range(n_chunks):
+            if local_best[c] < best:
+                best = local_best[c]
+                nxt = local_idx[c]
+        if nxt == -1:
+            return NO_TOUR
+        total += best
+        visited[nxt] = True
+        curr = nxt
+
+    total += cost[curr, start]
+    return total
+
+
+def nearest_neighbor_cost_par(cost, start):
+    # Thread count is read here: calling get_num_threads() inside the kernel
+    # would stop Numba from caching it.
+    return _nearest_neighbor_cost_par(cost, start, get_num_threads())
+
+
+def neighbor_order(cost):
+    # Row i lists every vertex by increasing cost[i, v] (ties by index), int32.
+    # Built row by row so the peak is one int64 argsort row, not n^2 of them.
+    n = cost.shape[0]
+    order = np.empty((n, n), np.int32)
+    for i in range(n):
+        order[i] = np.argsort(cost[i], kind="stable")
+    return order
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def _nearest_neighbor_sorted(cost, order, start, visited):
+    # Nearest-neighbour tour cost from 'start' using neighbor_order() rows:
+    # the first unvisited entry of a row is the nearest, so each step only
+    # skips already-visited neighbours instead of scanning the whole row.
+    n = cost.shape[0]
+    visited[:] = False
+    visited[start] = True
+    curr = np.int64(start)
+    total = 0
+    for _ in range(n - 1):
+        row = order[curr]
+        nxt = -1
+        for j in range(n):
+            v = np.int64(row[j])
+            if not visited[v] and cost[curr, v] > 0:
+                nxt = v
+                break
+        if nxt == -1:
+            return NO_TOUR
+        v = nxt
+        total += cost[curr, v]
+        visited[v] = True
+        curr = v
+    total += cost[curr, start]
+    return total
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def nearest_neighbor_multistart(cost, order):
+    # Best nearest-neighbour tour over every start vertex (NO_TOUR if every
+    # start gets stuck); starts run in parallel.
+    n = cost.shape[0]
+    costs = np.empty(n, np.int64)
+    for s in prange(n):
+        visited = np.empty(n, np.bool_)
+        c = _nearest_neighbor_sorted(cost, order, s, visited)
+        costs[s] = INF if c == NO_TOUR else c
+    best = costs.min()
+    return NO_TOUR if best == INF else best
+
+
+@njit(nogil=True, cache=True)
+def repeat_approx_tsp(cost, runs):
+    # approx_tsp_cost run 'runs' times back to back (for timing); returns the last cost.
+    last = 0
+    for _ in range(runs):
+        last = approx_tsp_cost(cost)
+    return last
+
+
+@njit(nogil=True, cache=True)
+def repeat_nearest_neighbor(cost, runs):
+    # nearest_neighbor_cost from node 0 run 'runs' times back to back; returns the last cost
+    # (or NO_TOUR).
+    last = 0
+    for _ in range(runs):
+        last = nearest_neighbor_cost(cost, 0)
+    return last
+
+
+@njit(nogil=True, cache=True, boundscheck=False)
+def _subsets_by_size(n):
+    # Every mask over n nodes that contains node 0, ordered by popcount,
+    # plus offsets so layer k (k nodes visited) is order[start[k]:start[k+1]].
+    m = 1 << (n - 1)
+    size = np.empty(m, np.int64)
+    counts = np.zeros(n + 2, np.int64)
+    for sub in range(m):
+        mask = (sub << 1) | 1
+        c = 0
+        while mask:
+            mask &= mask - 1
+            c += 1
+        size[sub] = c
+        counts[c + 1] += 1
+    start = np.cumsum(counts)
+    fill = start.copy()
+    order = np.empty(m, np.int64)
+    for sub in range(m):
+        order[fill[size[sub]]] = (sub << 1) | 1
+        fill[size[sub]] += 1
+    return order, start
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def held_karp(cost, upper):
+    # Exact TSP tour cost from node 0 via Held-Karp bitmask DP, O(n^2 * 2^n).
+    # dp[mask >> 1, last] = cheapest path from 0 visiting exactly 'mask' (which
+    # always holds node 0, so bit 0 is dropped from the index), ending at 'last'.
+    # Masks of one popcount only read the previous layer, so each layer is
+    # filled in parallel across threads and the layers are the only barriers.
+    #
+    # Branch and bound: the cheaper of the tour 0 -> 1 -> ... -> n-1 -> 0
+    # (which always exists) and 'upper', the caller's best known tour (e.g.
+    # nearest_neighbor_multistart; NO_TOUR for none), is an upper bound. The
+    # rest of a tour leaves 'last', enters and leaves every unvisited node, and
+    # enters 0. Every edge costs at least the cheapest edge out of its tail and
+    # the cheapest edge into its head, so dp + half the sum of those per-node
+    # minima is a lower bound (compared doubled to stay in integers). With
+    # symmetric costs an unvisited node's two edges are distinct edges at that
+    # node, so its term tightens to its two cheapest edges. States whose bound
+    # exceeds the upper bound are dropped, and masks with no surviving state
+    # are skipped entirely in the next layer.
+    n = cost.shape[0]
+    if n <= 1:
+        return 0
+    seq = np.int64(cost[n - 1, 0])
+    for v in range(n - 1):
+        seq += cost[v, v + 1]
+    if upper == NO_TOUR or seq < upper:
+        upper = seq
+    limit = 2 * upper if upper <= INF // 2 else INF
+    # out1/in1: cheapest edge out of / into each node; m2: second-cheapest out
+    out1 = np.full(n, INF, np.int64)
+    in1 = np.full(n, INF, np.int64)
+    m2 = np.full(n, INF, np.int64)
+    symmetric = True
+    for v in range(n):
+        for w in range(n):
+            if w == v:
+                continue
+            c = cost[v, w]
+            if c != cost[w, v]:
+                symmetric = False
+            if c < out1[v]:
+                m2[v] = out1[v]
+                out1[v] = c
+            elif c < m2[v]:
+                m2[v] = c
+            if c < in1[w]:
+                in1[w] = c
+    deg = out1 + m2 if symmetric else out1 + in1
+    deg_total = deg.sum()
+
+    order, start = _subsets_by_size(n)
+    dp = np.full((1 << (n - 1), n), INF, np.int64)
+    alive = np.zeros(1 << (n - 1), np.bool_)
+    dp[0, 0] = 0
+    alive[0] = True
+
+    for k in range(2, n + 1):
+        for idx in prange(start[k], start[k + 1]):
+            mask = order[idx]
+            # per-node minima at every node not yet visited
+            rest = deg_total
+            for v in range(n):
+                if (mask >> v) & 1:
+                    rest -= deg[v]
+            any_alive = False
+            for last in range(1, n):
+                if not (mask >> last) & 1:
+                    continue
+                prev_mask = mask ^ (1 << last)
+                if not alive[prev_mask >> 1]:
+                    continue
+                best = INF
+                for prev in range(n):
+                    if not (prev_mask >> prev) & 1:
+                        continue
+                    base = dp[prev_mask >> 1, prev]
+                    if base == INF:
+                        continue
+                    cand = base + cost[prev, last]
+                    if cand < best:
+                        best = cand
+                if best != INF and 2 * best + rest + out1[last] + in1[0] <= limit:
+                    dp[mask >> 1, last] = best
+                    any_alive = True
+            alive[mask >> 1] = any_alive
+
+    # Close the cycle back to 0 (the upper-bound tour if nothing beats it)
+    full = (1 << n) - 1
+    best = upper
+    for k in range(1, n):
+        if dp[full >> 1, k] == INF:
+            continue
+        cand = dp[full >> 1, k] + cost[k, 0]
+        if cand < best:
+            best = cand
+    return best
+
+
+def _warmup():
+    # Each dtype, and read-only matrices (e.g. memory-mapped cached graphs),
+    # compile separately
+    mats = []
+    for dtype in COST_DTYPES:
+        g = np.array([[0, 1, 2], [1, 0, 3], [2, 3, 0]], dtype=dtype)
+        ro = g.copy()
+        ro.flags.writeable = False
+        mats += [g, ro]
+    for cost in mats:
+        approx_tsp_cost(cost)
+        repeat_approx_tsp(cost, 1)
+        repeat_nearest_neighbor(cost, 1)
+        nearest_neighbor_cost(cost, 0)
+        nearest_neighbor_cost_par(cost, 0)
+        held_karp(cost, NO_TOUR)
+        nearest_neighbor_multistart(cost, neighbor_order(cost))
+
+
+_warmup()
@@ -0,0 +1,68 @@
+# Regression check: Held-Karp (with pruning) must match trying every permutation.
+# Run with: python -m unittest question4_files/test_brute_force_tsp.py
+
+import itertools
+import unittest
+
+import numpy as np
+
+try:
+    import question4_files.Brute_Force_TSP as BF
+except ModuleNotFoundError:
+    import Brute_Force_TSP as BF
+
+
+def permutation_min_cost(cost):
+    # Reference optimum: every tour from node 0, O(n!).
+    n = len(cost)
+    best = None
+    for perm in itertools.permutations(range(1, n)):
+        tour = (0,) + perm + (0,)
+        total = sum(int(cost[a][b]) for a, b in zip(tour, tour[1:]))
+        if best is None or total < best:
+            best = total
+    return best if best is not None else 0
+
+
+class HeldKarpMatchesPermutations(unittest.TestCase):
+    def test_asymmetric_example(self):
+        cost = [[0, 30, 47, 43, 94], [18, 0, 13, 33, 53], [46, 77, 0, 6, 71],
+                [8, 87, 59, 0, 5], [94, 82, 41, 40, 0]]
+        self.assertEqual(BF.tsp_min_cost(cost), 138)
+
+    def test_random_asymmetric(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            n = int(rng.integers(3, 9))
+            cost = rng.integers(1, 101, size=(n, n), dtype=np.int32)
+            np.fill_diagonal(cost, 0)
+            self.assertEqual(BF.tsp_min_cost(cost), permutation_min_cost(cost), cost.tolist())
+
+    def test_random_symmetric(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            n = int(rng.integers(3, 9))
+            cost = np.triu(rng.integers(1, 101, size=(n, n), dtype=np.int32), 1)
+            cost += cost.T
+            for dtype in (np.int16, np.int32):
+                self.assertEqual(BF.tsp_min_cost(cost.astype(dtype)), permutation_min_cost(cost))
+
+    def test_zero_weights(self):
+        # Zero-weight edges can leave the nearest-neighbour walk stuck, so the
+        # pruning bound must not depend on it.
+        self.assertEqual(BF.tsp_min_cost(np.zeros((4, 4), np.int32)), 0)
+        rng = np.random.default_rng(2)
+        for _ in range(300):
+            n = int(rng.integers(3, 8))
+            cost = rng.integers(0, 4, size=(n, n), dtype=np.int32)
+            if rng.integers(2):
+                cost = np.triu(cost, 1)
+                cost += cost.T
+            np.fill_diagonal(cost, 0)
+            for dtype in (np.int16, np.int32):
+                self.assertEqual(BF.tsp_min_cost(cost.astype(dtype)), permutation_min_cost(cost),
+                                 cost.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
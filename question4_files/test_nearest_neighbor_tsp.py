@@ -0,0 +1,58 @@
+# Regression check: multi-start nearest-neighbour must equal the best single-start tour.
+# Run with: python -m unittest question4_files/test_nearest_neighbor_tsp.py
+
+import unittest
+
+import numpy as np
+
+try:
+    import question4_files.Nearest_Neighbor_TSP as NN
+except ModuleNotFoundError:
+    import Nearest_Neighbor_TSP as NN
+
+
+def best_single_start(cost):
+    # Reference: nearest_neighbor_cost from every start that does not get stuck.
+    costs = []
+    for s in range(len(cost)):
+        try:
+            costs.append(NN.nearest_neighbor_cost(cost, s))
+        except ValueError:
+            pass
+    return min(costs) if costs else None
+
+
+class BestNearestNeighborMatchesStarts(unittest.TestCase):
+    def test_random(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            n = int(rng.integers(2, 40))
+            cost = rng.integers(1, 101, size=(n, n), dtype=np.int32)
+            if rng.integers(2):
+                cost = np.triu(cost, 1)
+                cost += cost.T
+            np.fill_diagonal(cost, 0)
+            for dtype in (np.int16, np.int32):
+                self.assertEqual(NN.best_nearest_neighbor_cost(cost.astype(dtype)), best_single_start(cost))
+
+    def test_zero_weights(self):
+        # Ties and zero-weight edges: a start may get stuck, the best must skip it.
+        rng = np.random.default_rng(1)
+        for _ in range(300):
+            n = int(rng.integers(2, 9))
+            cost = rng.integers(0, 4, size=(n, n), dtype=np.int32)
+            np.fill_diagonal(cost, 0)
+            expected = best_single_start(cost)
+            if expected is None:
+                with self.assertRaises(ValueError):
+                    NN.best_nearest_neighbor_cost(cost)
+            else:
+                self.assertEqual(NN.best_nearest_neighbor_cost(cost), expected, cost.tolist())
+
+    def test_stuck_everywhere(self):
+        with self.assertRaises(ValueError):
+            NN.best_nearest_neighbor_cost(np.zeros((4, 4), np.int32))
+
+
+if __name__ == "__main__":
+    unittest.main()
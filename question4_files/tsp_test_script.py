@@ -1,10 +1,19 @@
 # TSP timing comparison: Exact (brute force) vs 2-approx (MST/double-tree) vs Nearest-Neighbor.
 
 # Now with live progress:
-# - Brute force runs in a separate process with a heartbeat every PROGRESS_INTERVAL seconds.
+# - Brute force runs in a separate process with a heartbeat every PROGRESS_INTERVAL seconds
+#   (the parent blocks in Process.join between heartbeats instead of polling).
 # - If the run exceeds MAX_BF_TIME, we terminate it and skip BF for larger n.
+# - The large-n sweep (fast methods only) runs one n per worker thread (compiled, GIL-free
+#   kernels) or, failing that, per worker process, each pinned to its own CPU. Every row
+#   times the same serial compiled kernels, whichever way it ran.
 
-import os, sys, time, math, random, csv, multiprocessing as mp
+import os, sys, math, csv, json, queue, functools, itertools, threading, multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter_ns  # integer ns; bound once, read on every timed batch
+from multiprocessing import shared_memory
+
+import numpy as np
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 ROOT = os.path.dirname(HERE)
@@ -25,93 +34,459 @@ except ModuleNotFoundError:
 # ----------------- configuration -----------------
 SEED = 42                    # fixed seed so runs are reproducible
 MAX_BF_TIME = 30 * 60        # 30 minutes cap for brute force (change if you like)
-AIM_TOTAL_FAST_SMALL = 0.50  # repeat fast algos until ~this total per n (small n)
-AIM_TOTAL_FAST_LARGE = 0.50  # same for large n
+BF_BUDGET = MAX_BF_TIME      # skip BF once its predicted time for the next n exceeds this (s)
+TIMING_REPEAT = 7            # timed samples per fast method and n; the fastest is reported
+TIMING_MIN_TIME = 0.05       # each sample repeats the call until it lasts at least this long (s)
 PROGRESS_INTERVAL = 5        # heartbeat interval (seconds) while BF is running
 
+# BF worker processes are spawned, not forked: the parallel kernels start a
+# thread pool at import, and forking a process that owns one leaves the parent
+# unable to exit.
+MP_CTX = mp.get_context("spawn")
+
 # Choose n-values you want to see. Brute force will auto-skip once too slow.
-N_SMALL = (5, 7, 9, 11, 13, 14, 15)   # candidates where we *attempt* brute force
+N_SMALL = (5, 7, 9, 11, 13, 14, 15, 17, 20)   # candidates where we *attempt* brute force (Held-Karp)
 N_LARGE = (50, 100, 200, 500, 1000, 2000, 5000, 10000)  # fast methods only
 
+# The large-n sweep runs one n per worker, each pinned to its own CPU (see bench_large_sweep)
+# (None = one worker per CPU this process may use; 1 = run in this process, one n at a time).
+LARGE_WORKERS = None
+
 OUT_CSV = os.path.join(HERE, "results_tsp_timings.csv")
 
+# Generated graphs are saved here and memory-mapped on later runs (None disables).
+# Bump GENERATOR_VERSION whenever generate_graph's output changes; stale files
+# are then deleted on the next run.
+GRAPH_CACHE_DIR = os.path.join(HERE, "_graph_cache")
+GENERATOR_VERSION = 4
+
+# Weights in [1, 100] fit in int16, half the bytes of int32 per cell (the
+# kernels accumulate tour costs in int64). Pass dtype=np.int32 for wider weights.
+GRAPH_DTYPE = np.int16
+GRAPH_STREAMS = 8   # independent RNG streams per graph (changing it changes every graph; part of the cache key)
+
 # -------------- data generation --------------
-def generate_graph(n, seed=SEED, low=1, high=100):
-    """Dense symmetric integer-weighted graph in [low, high]."""
-    rnd = random.Random(seed + n)  # vary by n but deterministically
-    g = [[0]*n for _ in range(n)]
-    for i in range(n):
-        for j in range(i+1, n):
-            w = rnd.randint(low, high)
-            g[i][j] = w
-            g[j][i] = w
+def _graph_cache_ready(cache_dir):
+    """Create cache_dir and drop entries written by another GENERATOR_VERSION."""
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, "cache.json")
+    try:
+        with open(meta_path) as f:
+            version = json.load(f).get("generator_version")
+    except (OSError, ValueError):
+        version = None
+    if version != GENERATOR_VERSION:
+        for name in os.listdir(cache_dir):
+            if name.endswith(".npy"):
+                os.remove(os.path.join(cache_dir, name))
+        with open(meta_path, "w") as f:
+            json.dump({"generator_version": GENERATOR_VERSION}, f)
+
+def disk_cached_graph(gen):
+    """
+    Memoize a graph generator on disk under GRAPH_CACHE_DIR.
+    - Cached graphs come back as read-only memory maps (no copy into RAM).
+    - The file name is keyed by every argument that changes the output.
+    """
+    checked = set()
+    lock = threading.Lock()  # large-sweep threads may generate graphs concurrently
+
+    @functools.wraps(gen)
+    def wrapper(n, seed=SEED, low=1, high=100, dtype=GRAPH_DTYPE):
+        cache_dir = GRAPH_CACHE_DIR
+        if cache_dir is None:
+            return gen(n, seed, low, high, dtype)
+        with lock:
+            if cache_dir not in checked:
+                _graph_cache_ready(cache_dir)
+                checked.add(cache_dir)
+        path = os.path.join(cache_dir, f"g_{n}_{seed}_{low}_{high}_{np.dtype(dtype).name}_s{GRAPH_STREAMS}.npy")
+        if not os.path.exists(path):
+            tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, gen(n, seed, low, high, dtype))
+            os.replace(tmp, path)  # never leave a half-written file under the real name
+        return np.load(path, mmap_mode="r")
+
+    return wrapper
+
+def _fill_upper_rows(g, lo, hi, rng, low, high):
+    # Draw the upper-triangle cells of rows lo..hi-1 in one call, then lay them out row by row.
+    n = g.shape[0]
+    vals = rng.integers(low, high + 1, size=(hi - lo) * (2 * n - lo - hi - 1) // 2, dtype=g.dtype)
+    off = 0
+    for i in range(lo, hi):
+        g[i, i + 1:] = vals[off:off + n - 1 - i]
+        off += n - 1 - i
+
+def _mirror_band(g, i0, i1):
+    # Copy the upper triangle of rows i0..i1-1 into the lower triangle.
+    g[i0:i1, :i0] = g[:i0, i0:i1].T
+    diag = g[i0:i1, i0:i1]
+    diag += diag.T
+
+@disk_cached_graph
+def generate_graph(n, seed=SEED, low=1, high=100, dtype=GRAPH_DTYPE):
+    """Dense symmetric integer-weighted graph in [low, high] (ndarray of 'dtype', zero diagonal)."""
+    info = np.iinfo(dtype)
+    if low < info.min or high > info.max:
+        raise ValueError(f"weights in [{low}, {high}] do not fit in {np.dtype(dtype).name}")
+    g = np.empty((n, n), dtype=dtype)
+
+    # The n(n-1)/2 upper-triangle cells are split into GRAPH_STREAMS row stripes
+    # of about equal size, each drawn from its own PCG64 stream spawned from
+    # one SeedSequence (vary by n but deterministically). Stripes are filled,
+    # then mirrored into the lower triangle band by band, on a thread pool:
+    # NumPy releases the GIL while drawing and copying. A fixed stream count
+    # keeps the graph independent of how many threads run.
+    # (g += g.T would need a full n x n temporary, as the operands overlap.)
+    streams = np.random.SeedSequence(seed + n).spawn(GRAPH_STREAMS)
+    rngs = [np.random.Generator(np.random.PCG64(s)) for s in streams]
+    rows = np.arange(n + 1)
+    cells_before = rows * (n - 1) - rows * (rows - 1) // 2  # upper cells in rows < i
+    cuts = np.searchsorted(cells_before, np.linspace(0, cells_before[-1], GRAPH_STREAMS + 1))
+    cuts[0], cuts[-1] = 0, n
+    band = 256
+    bands = [(i0, min(i0 + band, n)) for i0 in range(0, n, band)]
+    for i0, i1 in bands:
+        g[i0:i1, i0:i1] = 0  # every other cell is written below
+
+    workers = max(1, min(GRAPH_STREAMS, len(_usable_cpus())))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda k: _fill_upper_rows(g, cuts[k], cuts[k + 1], rngs[k], low, high),
+                      range(GRAPH_STREAMS)))
+        list(pool.map(lambda b: _mirror_band(g, *b), bands))
     return g
 
 # -------------- timing helpers --------------
-def time_once(fn, *args):
-    t0 = time.perf_counter()
-    val = fn(*args)
-    dt = time.perf_counter() - t0
-    return dt, val
-
-def time_repeated_total(fn, graph, min_total):
-    """
-    Repeat fn(graph) until total_time >= min_total (or at least 1 run).
-    Returns (total_time, runs, last_value).
-    """
-    total = 0.0
-    runs = 0
-    last = None
-    # Warm-up single run to get a per-call estimate:
-    t_one, last = time_once(fn, graph)
-    total += t_one
-    runs += 1
-    if t_one < min_total:
-        remaining = max(0.0, min_total - t_one)
-        per = max(t_one, 1e-6)
-        extra_runs = int(math.ceil(remaining / per))
-        for _ in range(extra_runs):
-            t, last = time_once(fn, graph)
-            total += t
-            runs += 1
-    return total, runs, last
+def _best_of(batch, repeat, min_time):
+    """
+    batch(number) times 'number' back-to-back calls and returns integer ns.
+    One call is timed first and sets the batch size, so each sample lasts about
+    min_time however fast the method is (a too-short scaled batch is rescaled
+    once, as a lone call's time includes the timer's own overhead). A call
+    slower than min_time is sampled alone, with fewer samples (at least 3) so
+    the total stays near repeat * min_time.
+    The fastest of the samples is kept: cold starts and OS jitter only ever add
+    time, so the minimum is the reproducible noise floor.
+    Returns (seconds_per_call, number).
+    """
+    min_ns = min_time * 1e9
+    one = max(batch(1), 1)
+    if one >= min_ns:
+        number = 1
+        repeat = max(min(repeat, 3), min(repeat, int(repeat * min_ns / one)))
+    else:
+        number = int(min_ns // one)
+        t = batch(number)
+        if t < 0.5 * min_ns:
+            number = int(math.ceil(number * min_ns / max(t, 1)))
+    best = min(batch(number) for _ in range(repeat))
+    return best * 1e-9 / number, number
+
+def time_compiled_per_call(repeat_nb, graph, repeat, min_time):
+    """
+    Best-of-'repeat' seconds per call of a compiled repeat loop (see _best_of):
+    repeat_nb(graph, number) makes every call in machine code, so one
+    perf_counter_ns pair brackets a batch.
+    Returns (seconds_per_call, calls_per_sample, last_value).
+    """
+    def batch(number):
+        t0 = perf_counter_ns()
+        repeat_nb(graph, number)
+        return perf_counter_ns() - t0
+    per_call, number = _best_of(batch, repeat, min_time)
+    return per_call, number, int(repeat_nb(graph, 1))
+
+def warm_up(graph, fns):
+    """
+    Untimed preparation before a graph is measured:
+    - sum every entry once so all of its pages are resident (a cached graph is a memory map),
+    - call each fn once so first-call costs stay out of the timings.
+    """
+    int(np.asarray(graph).sum())
+    for fn in fns:
+        fn(graph)
+
+# -------------- extrapolation --------------
+# Each method's time is modelled as t = c * ops(n)^a, i.e. log(t) is linear in
+# log(ops(n)), with ops(n) its operation count.
+def log_ops_held_karp(n):
+    return n * math.log(2) + 2 * math.log(n)   # 2^n * n^2
+
+def log_ops_dense(n):
+    return 2 * math.log(n)                      # n^2 (dense Prim / NN scans)
+
+def fit_complexity(ns, times, log_ops):
+    """Least-squares fit of log(t) = a*log_ops(n) + b. Returns (a, b), or None with < 2 points."""
+    if len(ns) < 2:
+        return None
+    x = [log_ops(n) for n in ns]
+    a, b = np.polyfit(x, np.log(np.maximum(times, 1e-9)), 1)
+    return float(a), float(b)
+
+def largest_n_within(fit, log_ops, budget, n_max=10**7):
+    """
+    Largest n whose fitted time is <= budget (binary search; the model grows with n).
+    Returns None if no growth was measured or n=1 is already over budget;
+    n_max if even n_max fits.
+    """
+    a, b = fit
+    if a <= 0:
+        return None
+    limit = math.log(budget)
+    if a * log_ops(1) + b > limit:
+        return None
+    lo, hi = 1, n_max
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a * log_ops(mid) + b <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def available_memory():
+    """Bytes of memory the OS reports as available now, or None where it does not say."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def dense_memory_bytes(n):
+    """Bytes of the n x n GRAPH_DTYPE cost matrix the dense heuristics read."""
+    return n * n * np.dtype(GRAPH_DTYPE).itemsize
+
+def largest_n_in_memory(memory_bytes, memory, n_max=10**7):
+    """Largest n <= n_max with memory_bytes(n) <= 'memory' (binary search; 1 at least)."""
+    lo, hi = 1, n_max
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if memory_bytes(mid) <= memory:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def format_bytes(b):
+    """'b' bytes in binary units, e.g. '2.3 TiB'."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if b < 1024:
+            return f"{b:.1f} {unit}"
+        b /= 1024
+    return f"{b:.1f} TiB"
+
+def predict_bf_time(ns, times, n):
+    """
+    Extrapolate BF time to n from the measured (ns, times) with the Held-Karp
+    model. Only the last 3 points are used: fixed overheads flatten the
+    smallest n and would under-predict the growth.
+    Returns None with fewer than 2 points.
+    """
+    fit = fit_complexity(ns[-3:], times[-3:], log_ops_held_karp)
+    if fit is None:
+        return None
+    a, b = fit
+    return math.exp(a * log_ops_held_karp(n) + b)
+
+def print_extrapolation(budget, bf_points, mst_points, nn_points, n_max=10**7, memory=None):
+    """
+    For each method, the largest n its fitted model finishes within 'budget' seconds.
+    Each fit uses the method's 3 largest measured n, where its leading term dominates.
+    Each n is also capped at the largest n whose data fit in 'memory' bytes (None =
+    unknown): the Held-Karp tables for brute force, the cost matrix for the rest.
+    Every line states the memory its n needs.
+    """
+    lines = [f"\nExtrapolated largest n within {budget}s (log t fitted against each method's operation count):\n"]
+    for label, (ns, times), log_ops, memory_bytes in (
+        ("Brute force (Held-Karp, 2^n·n^2)", bf_points, log_ops_held_karp, BF.memory_bytes),
+        ("2-Approx MST (n^2)", mst_points, log_ops_dense, dense_memory_bytes),
+        ("Nearest-Neighbor (n^2)", nn_points, log_ops_dense, dense_memory_bytes),
+    ):
+        fit = fit_complexity(ns[-3:], times[-3:], log_ops)
+        n_fit = None if fit is None else largest_n_within(fit, log_ops, budget, n_max)
+        n_mem = None if memory is None or n_fit is None else largest_n_in_memory(memory_bytes, memory, n_max)
+        if n_fit is None:
+            shown = "—"
+        elif n_mem is not None and n_mem < n_fit:
+            bound = "≥" if n_fit == n_max else "≈"
+            shown = (f"n ≈ {n_mem:,} (memory-bound: needs {format_bytes(memory_bytes(n_mem))} "
+                     f"of {format_bytes(memory)}; n {bound} {n_fit:,} would need "
+                     f"{format_bytes(memory_bytes(n_fit))})")
+        elif n_fit == n_max:
+            shown = f"n ≥ {n_fit:,} (needs {format_bytes(memory_bytes(n_fit))})"
+        else:
+            shown = f"n ≈ {n_fit:,} (needs {format_bytes(memory_bytes(n_fit))})"
+        lines.append(f"  {label:<34} {shown}\n")
+    _write("".join(lines))
+
+# -------------- parallel large-n sweep --------------
+def _usable_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def _pin_worker(next_slot, cpus):
+    """
+    Pool initializer: pin this worker to the next CPU in 'cpus' and keep
+    Numba single-threaded, so concurrent timings do not share cores.
+    """
+    with next_slot.get_lock():
+        slot = next_slot.value
+        next_slot.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpus[slot % len(cpus)]})
+    from numba import set_num_threads
+    set_num_threads(1)
+
+def _pin_thread(slots, lock):
+    """
+    Thread pool initializer: pin this worker thread to the next CPU from
+    'slots', so concurrent timings do not share cores (Linux; elsewhere the
+    threads are left to the scheduler).
+    """
+    with lock:
+        cpu = next(slots)
+    if hasattr(os, "sched_setaffinity") and hasattr(threading, "get_native_id"):
+        os.sched_setaffinity(threading.get_native_id(), {cpu})
+
+def time_fast_methods(n, g, repeat, min_time):
+    """
+    Time MST and NN on the same graph g: each algorithm's input is prepared
+    once (a one-off cost, not timed) and warmed up, then timed per call.
+    Every n, in every sweep, times the same serial compiled repeat loops, so
+    rows are comparable however the sweep is run (NN.run switches to its
+    parallel scan at large n; that is not what is measured here).
+    Returns a result row with no BF time.
+    """
+    mst_prep, nn_prep = MST.prepare(g), NN.prepare(g)
+    warm_up(mst_prep, (MST.approx_tsp_nb,))
+    warm_up(nn_prep, (lambda p: NN.nn_cost_nb(p, 0),))
+    mst_s, mst_calls, _ = time_compiled_per_call(MST.approx_tsp_repeat_nb, mst_prep, repeat, min_time)
+    nn_s,  nn_calls,  _ = time_compiled_per_call(NN.nn_cost_repeat_nb, nn_prep, repeat, min_time)
+    return {
+        "n": n,
+        "bf_time_s": None,
+        "mst_s": mst_s,
+        "mst_calls": mst_calls,
+        "nn_s": nn_s,
+        "nn_calls": nn_calls
+    }
+
+def _bench_large_n(n, seed, repeat, min_time):
+    """
+    Fast methods only for one large n (runs in a pool worker thread or
+    process; the timed loops release the GIL for the whole batch).
+    Returns a result row.
+    """
+    g = generate_graph(n, seed)
+    return time_fast_methods(n, g, repeat, min_time)
+
+def _nogil_compiled(*fns):
+    # True when every fn is a Numba dispatcher (compiled; the kernels are nogil).
+    return all(hasattr(fn, "nopython_signatures") for fn in fns)
+
+def bench_large_sweep(n_values, repeat, min_time):
+    """
+    Yield _bench_large_n rows in n_values order.
+    With more than one worker, every n runs concurrently: in a thread when the
+    timed entry points are compiled (no process start-up, the cached graphs are
+    mapped once), otherwise in its own process. Either way each worker is
+    pinned to its own CPU, but concurrent rows still share the last-level cache
+    and memory bandwidth, so the largest n can time somewhat slower than they
+    would alone; LARGE_WORKERS = 1 times every n in isolation.
+    """
+    cpus = _usable_cpus()
+    workers = min(len(n_values), LARGE_WORKERS or len(cpus))
+    if workers <= 1:
+        for n in n_values:
+            yield _bench_large_n(n, SEED, repeat, min_time)
+        return
+    if _nogil_compiled(MST.approx_tsp_repeat_nb, NN.nn_cost_repeat_nb):
+        with ThreadPoolExecutor(max_workers=workers, initializer=_pin_thread,
+                                initargs=(itertools.cycle(cpus), threading.Lock())) as pool:
+            futures = [pool.submit(_bench_large_n, n, SEED, repeat, min_time) for n in n_values]
+            for fut in futures:
+                yield fut.result()
+        return
+    next_slot = MP_CTX.Value("i", 0)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=MP_CTX,
+                             initializer=_pin_worker, initargs=(next_slot, cpus)) as pool:
+        futures = [pool.submit(_bench_large_n, n, SEED, repeat, min_time) for n in n_values]
+        for fut in futures:
+            yield fut.result()
 
 # -------------- brute-force with heartbeat & timeout --------------
-def _bf_worker(graph, q):
-    """Run BF in a separate process and put (cost,) in q on success."""
+def _bf_worker(shm_name, shape, dtype, q):
+    """
+    Run BF in a separate process and put (cost, seconds) in q on success.
+    The graph is read in place from the parent's shared-memory block.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    graph = prep = None
     try:
-        cost = BF.tsp_min_cost(graph)
-        q.put(("ok", cost))
+        graph = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        prep = BF.prepare(graph)
+        # Time the solve here so interpreter start-up in the child is not counted.
+        t0 = perf_counter_ns()
+        cost = BF.run(prep)
+        q.put(("ok", (cost, (perf_counter_ns() - t0) * 1e-9)))
     except Exception as e:
         q.put(("err", str(e)))
+    finally:
+        graph = prep = None  # drop the views into the block so it can be closed
+        shm.close()
 
 def run_bf_with_progress(n, graph, cap_seconds, interval=PROGRESS_INTERVAL):
     """
     Returns (elapsed_s, cost or None, exceeded_cap: bool)
+    - elapsed_s is the worker's own solve time when it finishes.
     - If exceeds cap, terminates the worker and returns (elapsed, None, True).
+    - The graph is placed in shared memory; only its name, shape and dtype are sent.
     """
-    q = mp.Queue()
-    p = mp.Process(target=_bf_worker, args=(graph, q))
-    start = time.perf_counter()
+    graph = np.ascontiguousarray(graph)
+    shm = shared_memory.SharedMemory(create=True, size=max(graph.nbytes, 1))
+    try:
+        np.ndarray(graph.shape, dtype=graph.dtype, buffer=shm.buf)[...] = graph
+        return _wait_for_bf(n, shm, graph, cap_seconds, interval)
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _wait_for_bf(n, shm, graph, cap_seconds, interval):
+    q = MP_CTX.Queue()
+    p = MP_CTX.Process(target=_bf_worker, args=(shm.name, graph.shape, graph.dtype.str, q))
+    start = perf_counter_ns()
     p.start()
     next_ping = interval
     exceeded = False
     cost = None
 
     while True:
-        # Check queue without blocking
-        if not q.empty():
-            status, payload = q.get()
-            elapsed = time.perf_counter() - start
+        # Sleep inside join() until the worker exits or the next heartbeat/cap is due
+        elapsed = (perf_counter_ns() - start) * 1e-9
+        p.join(timeout=max(0.001, min(next_ping - elapsed, cap_seconds - elapsed)))
+        elapsed = (perf_counter_ns() - start) * 1e-9
+
+        if not p.is_alive():
+            # The worker put its (small) result before exiting
+            try:
+                status, payload = q.get(timeout=1.0)
+            except queue.Empty:
+                status, payload = "err", "worker exited without a result"
             if status == "ok":
-                cost = payload
+                cost, elapsed = payload
             else:
                 cost = None
-            p.join(timeout=0.1)
             return elapsed, cost, False
 
-        elapsed = time.perf_counter() - start
-
         # Heartbeat
         if elapsed >= next_ping:
             print(f"  n={n} | BF … {int(elapsed)}s", flush=True)
@@ -128,86 +503,107 @@ def run_bf_with_progress(n, graph, cap_seconds, interval=PROGRESS_INTERVAL):
                 pass
             return elapsed, None, True
 
-        time.sleep(0.05)
+# -------------- output --------------
+CSV_HEADER = ["n", "brute_force_time_s", "approx_mst_time_per_call_s", "approx_mst_calls_per_sample",
+              "nearest_neighbor_time_per_call_s", "nearest_neighbor_calls_per_sample"]
+
+def _write(text):
+    # Each table block goes out as one write and one flush, not a print per line.
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+def _print_table_header():
+    _write(f"Results Table (fast methods: best of {TIMING_REPEAT} samples, seconds per call)\n"
+           "| n | Brute-Force (s) | 2-Approx MST per call (s) [calls/sample] | Nearest-Neighbor per call (s) [calls/sample] |\n"
+           "|---|------------------|------------------------------------------|----------------------------------------------|\n")
+
+def _print_row(r):
+    bf_str = "—" if r["bf_time_s"] is None else f"{r['bf_time_s']:.4f}"
+    _write(f"| {r['n']:>2} | {bf_str:>16} | {r['mst_s']:>24.3e} [{r['mst_calls']:>7}] | "
+           f"{r['nn_s']:>28.3e} [{r['nn_calls']:>7}] |\n")
+
+def _csv_row(r):
+    return [r["n"],
+            "" if r["bf_time_s"] is None else f"{r['bf_time_s']:.6f}",
+            f"{r['mst_s']:.6e}", r["mst_calls"],
+            f"{r['nn_s']:.6e}", r["nn_calls"]]
 
 # -------------- runner --------------
 def run_suite():
     print("TSP timing comparison (same random graph per n)")
     print(f"Seed = {SEED}, BF cap = {MAX_BF_TIME}s\n")
 
-    rows = []
     largest_n_under_cap = None
 
-    # Try brute force on the small set until it would exceed the cap.
-    bf_still_ok = True
-    for n in N_SMALL:
-        g = generate_graph(n)
-
-        # --- brute force (exact) with heartbeat ---
-        bf_time = None
-        bf_cost = None
-        if bf_still_ok:
-            print(f"Starting n={n} …", flush=True)
-            bf_time, bf_cost, exceeded = run_bf_with_progress(n, g, MAX_BF_TIME, PROGRESS_INTERVAL)
-            if exceeded or bf_cost is None:
+    # Each row is printed and appended to the CSV (flushed) as soon as it is
+    # measured, so stopping the run early keeps everything measured so far.
+    with open(OUT_CSV, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_HEADER)
+
+        # (ns, seconds per call) per fast method, for the extrapolation at the end
+        mst_points, nn_points = ([], []), ([], [])
+
+        def emit(row):
+            _print_row(row)
+            for (ns, times), key in ((mst_points, "mst_s"), (nn_points, "nn_s")):
+                ns.append(row["n"])
+                times.append(row[key])
+            w.writerow(_csv_row(row))
+            f.flush()
+
+        _print_table_header()
+
+        # Try brute force on the small set until it would exceed the cap.
+        # BF is also skipped once the fit over its earlier times predicts more than BF_BUDGET,
+        # or once its tables would not fit in the memory available.
+        bf_still_ok = True
+        bf_ns, bf_times = [], []
+        for n in N_SMALL:
+            g = generate_graph(n)  # one graph shared by BF, MST and NN
+
+            # --- brute force (exact) with heartbeat ---
+            bf_time = None
+            bf_cost = None
+            predicted = predict_bf_time(bf_ns, bf_times, n) if bf_still_ok else None
+            if predicted is not None and predicted > BF_BUDGET:
                 bf_still_ok = False
-                print(f"Brute force exceeded cap at n={n}; skipping BF from here on.\n", flush=True)
-            else:
-                largest_n_under_cap = n
-                print(f"  n={n} | BF done in {bf_time:.4f}s (cost={bf_cost})\n", flush=True)
-
-        # --- fast methods (repeat to ~AIM_TOTAL_FAST_SMALL seconds total) ---
-        mst_total, mst_runs, _ = time_repeated_total(MST.approx_tsp, g, AIM_TOTAL_FAST_SMALL)
-        nn_total,  nn_runs,  _ = time_repeated_total(NN.nearest_neighbor_cost, g, AIM_TOTAL_FAST_SMALL)
-
-        rows.append({
-            "n": n,
-            "bf_time_s": bf_time,
-            "mst_total_s": mst_total,
-            "mst_runs": mst_runs,
-            "nn_total_s": nn_total,
-            "nn_runs": nn_runs
-        })
-
-    # Large n block: only fast methods (still repeated to ~AIM_TOTAL_FAST_LARGE seconds).
-    for n in N_LARGE:
-        g = generate_graph(n)
-        print(f"Fast-only n={n} …", flush=True)
-        mst_total, mst_runs, _ = time_repeated_total(MST.approx_tsp, g, AIM_TOTAL_FAST_LARGE)
-        nn_total,  nn_runs,  _ = time_repeated_total(NN.nearest_neighbor_cost, g, AIM_TOTAL_FAST_LARGE)
-        rows.append({
-            "n": n,
-            "bf_time_s": None,
-            "mst_total_s": mst_total,
-            "mst_runs": mst_runs,
-            "nn_total_s": nn_total,
-            "nn_runs": nn_runs
-        })
-
-    # ---- terminal output ----
-    print("\nResults Table (totals for fast methods; they are repeated to avoid 0.0000 artifacts)")
-    print("| n | Brute-Force (s) | 2-Approx MST total (s) [runs] | Nearest-Neighbor total (s) [runs] |")
-    print("|---|------------------|-------------------------------|------------------------------------|")
-    for r in rows:
-        bf_str = "—" if r["bf_time_s"] is None else f"{r['bf_time_s']:.4f}"
-        print(f"| {r['n']:>2} | {bf_str:>16} | {r['mst_total_s']:>27.4f} [{r['mst_runs']:>3}] | "
-              f"{r['nn_total_s']:>34.4f} [{r['nn_runs']:>3}] |")
+                print(f"Brute force predicted to take ~{predicted:.0f}s at n={n} (budget {BF_BUDGET}s); "
+                      f"skipping BF from here on.", flush=True)
+            memory = available_memory() if bf_still_ok else None
+            if memory is not None and BF.memory_bytes(n) > memory:
+                bf_still_ok = False
+                print(f"Brute force needs {format_bytes(BF.memory_bytes(n))} at n={n} "
+                      f"({format_bytes(memory)} available); skipping BF from here on.", flush=True)
+            if bf_still_ok:
+                print(f"Starting n={n} …", flush=True)
+                bf_time, bf_cost, exceeded = run_bf_with_progress(n, g, MAX_BF_TIME, PROGRESS_INTERVAL)
+                if exceeded or bf_cost is None:
+                    bf_still_ok = False
+                    print(f"Brute force exceeded cap at n={n}; skipping BF from here on.", flush=True)
+                else:
+                    largest_n_under_cap = n
+                    bf_ns.append(n)
+                    bf_times.append(bf_time)
+                    print(f"  n={n} | BF done in {bf_time:.4f}s (cost={bf_cost})", flush=True)
+
+            # --- fast methods (best of TIMING_REPEAT samples, per call) ---
+            row = time_fast_methods(n, g, TIMING_REPEAT, TIMING_MIN_TIME)
+            row["bf_time_s"] = bf_time
+            emit(row)
+
+        # Large n block: only fast methods (timed the same way), one n per pinned worker.
+        for row in bench_large_sweep(N_LARGE, TIMING_REPEAT, TIMING_MIN_TIME):
+            emit(row)
 
     if largest_n_under_cap is None:
         print("\nBrute force exceeded the time cap at the very first attempted n.")
     else:
         print(f"\nLargest n solved under the {MAX_BF_TIME}s cap by brute force: n = {largest_n_under_cap}")
 
-    # ---- write CSV ----
-    with open(OUT_CSV, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["n", "brute_force_time_s", "approx_mst_total_time_s", "approx_mst_runs",
-                    "nearest_neighbor_total_time_s", "nearest_neighbor_runs"])
-        for r in rows:
-            w.writerow([r["n"],
-                        "" if r["bf_time_s"] is None else f"{r['bf_time_s']:.6f}",
-                        f"{r['mst_total_s']:.6f}", r["mst_runs"],
-                        f"{r['nn_total_s']:.6f}", r["nn_runs"]])
+    print_extrapolation(MAX_BF_TIME, (bf_ns, bf_times), mst_points, nn_points,
+                        memory=available_memory())
+
     print(f"\nWrote {OUT_CSV}")
 
 if __name__ == "__main__":
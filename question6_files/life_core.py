@@ -1,31 +1,210 @@
 # Game of Life implementation for this assignment.
-# Random initialisation, state hashing, oscillation detection, glider detection.
+# Random initialisation, bit-packed stepping, state hashing, oscillation detection, glider detection.
 
 from __future__ import annotations
-from dataclasses import dataclass
+import sys
+from collections import deque
+from dataclasses import dataclass, field
 import numpy as np
-from typing import Optional, Tuple, Dict, List
+from numba import njit
+from typing import Optional, Tuple, Dict, List, Deque
 
+# Imported as "life_core" by run_life_experiment.py and as
+# "question6_files.life_core" by the tests. Numba's disk cache records the
+# importing module's name, so register both names for one module object and
+# cached kernels load whichever way the file was reached.
+sys.modules.setdefault("life_core", sys.modules[__name__])
+sys.modules.setdefault("question6_files.life_core", sys.modules[__name__])
 
-def next_state_bounded(grid: np.ndarray) -> np.ndarray:
+
+@dataclass
+class LifeStepper:
     """
-    Next generation with bounded edges (no wrap).
-    Implemented via zero-padding + 8 aligned slices (no broadcasting issues).
-    Returns uint8 array of shape grid.shape with 0/1 values.
+    Next generation with bounded edges (no wrap) for (n,n) uint8 grids.
+    Owns the zero-padded frame, the neighbour-count buffer and the rule masks,
+    so a step allocates nothing: neighbours are summed in place with +=.
     """
-    g = grid.astype(np.uint8)
-    P = np.pad(g, 1, mode="constant")  # pad with zeros around
-
-    # sum 8 neighbours from the padded array, aligned to the inner (original) region
-    nb = (
-        P[0:-2, 0:-2] + P[0:-2, 1:-1] + P[0:-2, 2:] +
-        P[1:-1, 0:-2]                 + P[1:-1, 2:] +
-        P[2:  , 0:-2] + P[2:  , 1:-1] + P[2:  , 2:]
-    )
+    n: int
 
-    new = ((g == 1) & ((nb == 2) | (nb == 3))) | ((g == 0) & (nb == 3))
-    return new.astype(np.uint8)
+    def __post_init__(self):
+        n = self.n
+        self._pad = np.zeros((n + 2, n + 2), dtype=np.uint8)  # border stays 0
+        self._nb = np.empty((n, n), dtype=np.uint8)
+        self._eq3 = np.empty((n, n), dtype=bool)
+        self._eq2 = np.empty((n, n), dtype=bool)
 
+    def step(self, grid: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Write the next generation of grid into out (allocated if None) and return it.
+        grid must already be uint8 (as random_grid returns); it is never converted.
+        """
+        if grid.dtype != np.uint8:
+            raise TypeError(f"LifeStepper expects a uint8 grid, got {grid.dtype}")
+        if out is None:
+            out = np.empty((self.n, self.n), dtype=np.uint8)
+        P = self._pad
+        P[1:-1, 1:-1] = grid
+        inner = P[1:-1, 1:-1]
+
+        # sum 8 neighbours from the padded array, aligned to the inner (original) region
+        nb = self._nb
+        np.copyto(nb, P[0:-2, 0:-2])
+        nb += P[0:-2, 1:-1]
+        nb += P[0:-2, 2:]
+        nb += P[1:-1, 0:-2]
+        nb += P[1:-1, 2:]
+        nb += P[2:, 0:-2]
+        nb += P[2:, 1:-1]
+        nb += P[2:, 2:]
+
+        # born with 3 neighbours, survives with 2 or 3
+        np.equal(nb, 3, out=self._eq3)
+        np.equal(nb, 2, out=self._eq2)
+        np.logical_and(self._eq2, inner, out=self._eq2)
+        np.logical_or(self._eq3, self._eq2, out=out)
+        return out
+
+
+_STEPPERS: Dict[int, LifeStepper] = {}
+
+def next_state_bounded(grid: np.ndarray, out: np.ndarray) -> None:
+    """
+    Next generation with bounded edges (no wrap), written into out.
+    grid and out are (n,n) uint8 with 0/1 values; the caller swaps buffers.
+    Reuses one LifeStepper per grid size, so repeated calls allocate nothing.
+    """
+    n = grid.shape[0]
+    stepper = _STEPPERS.get(n)
+    if stepper is None:
+        stepper = _STEPPERS[n] = LifeStepper(n)
+    stepper.step(grid, out=out)
+
+
+
+# ----- Bit-packed stepping -----
+# Each row is packed into uint64 words (cell j -> word j // 64, bit j % 64).
+# Neighbour counts are built with bit-sliced adders, 64 cells per word op.
+
+# xxh64-style hash over packed words, shared by grid_hash and the step kernel.
+_P1 = np.uint64(0x9E3779B185EBCA87)
+_P2 = np.uint64(0xC2B2AE3D27D4EB4F)
+_P4 = np.uint64(0x85EBCA77C2B2AE63)
+
+
+@njit(cache=True)
+def _hash_round(h, w):
+    # one xxh64-style round folding word w into h
+    k = w * _P2
+    k = ((k << np.uint64(31)) | (k >> np.uint64(33))) * _P1
+    h ^= k
+    return ((h << np.uint64(27)) | (h >> np.uint64(37))) * _P1 + _P4
+
+
+@njit(cache=True)
+def _hash_final(h):
+    h ^= h >> np.uint64(33)
+    h *= _P2
+    h ^= h >> np.uint64(29)
+    return h
+
+
+@njit(cache=True)
+def _hash_words(words):
+    # Hash of a flat uint64 buffer, read in place (row-major word order).
+    h = np.uint64(words.size) * _P4
+    for i in range(words.size):
+        h = _hash_round(h, words[i])
+    return _hash_final(h)
+
+
+_ONE = np.uint64(1)
+_TOP = np.uint64(63)
+
+
+def pack_grid(grid: np.ndarray) -> np.ndarray:
+    """(n,n) 0/1 grid -> (n, ceil(n/64)) uint64 words; padding bits are 0."""
+    n_rows, n = grid.shape
+    words = (n + 63) // 64
+    b = np.zeros((n_rows, words * 8), dtype=np.uint8)
+    b[:, :(n + 7) // 8] = np.packbits(grid, axis=1, bitorder="little")
+    return b.view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack_grid(packed: np.ndarray, n: int) -> np.ndarray:
+    """Inverse of pack_grid: uint64 words -> (n,n) uint8 grid."""
+    b = packed.astype("<u8", copy=False).view(np.uint8)
+    return np.unpackbits(b, axis=1, count=n, bitorder="little")
+
+
+@njit(cache=True)
+def _step_packed(P, out, last_mask):
+    # Writes the next generation into out and returns (hash, any_alive, changed):
+    # its _hash_words() hash plus OR-reductions of the new words and of
+    # new ^ old, all folded in as each word is produced (no second pass).
+    rows, W = P.shape
+    zero = np.uint64(0)
+    h = np.uint64(rows * W) * _P4
+    live = zero
+    diff = zero
+    for i in range(rows):
+        for k in range(W):
+            # 3-bit counter (s2 s1 s0) per cell; a count of 8 wraps to 0 (dead either way)
+            s0 = zero
+            s1 = zero
+            s2 = zero
+            for r in range(i - 1, i + 2):
+                if r < 0 or r >= rows:
+                    continue
+                w = P[r, k]
+                prev = P[r, k - 1] if k > 0 else zero
+                nxt = P[r, k + 1] if k < W - 1 else zero
+                west = (w << _ONE) | (prev >> _TOP)
+                east = (w >> _ONE) | (nxt << _TOP)
+                # half-adder chain: add west, east and (off the centre row) w
+                c = s0 & west
+                s0 ^= west
+                c2 = s1 & c
+                s1 ^= c
+                s2 ^= c2
+                c = s0 & east
+                s0 ^= east
+                c2 = s1 & c
+                s1 ^= c
+                s2 ^= c2
+                if r != i:
+                    c = s0 & w
+                    s0 ^= w
+                    c2 = s1 & c
+                    s1 ^= c
+                    s2 ^= c2
+            # alive iff count == 3, or count == 2 and already alive
+            new = ~s2 & s1 & (s0 | P[i, k])
+            if k == W - 1:
+                new &= last_mask
+            out[i, k] = new
+            h = _hash_round(h, new)
+            live |= new
+            diff |= new ^ P[i, k]
+    return _hash_final(h), live != zero, diff != zero
+
+
+def next_state_packed(packed: np.ndarray, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Next generation (bounded edges) of a pack_grid() grid of width n."""
+    if out is None:
+        out = np.empty_like(packed)
+    step_packed_summary(packed, n, out)
+    return out
+
+
+def step_packed_summary(packed: np.ndarray, n: int, out: np.ndarray) -> Tuple[int, bool, bool]:
+    """
+    Like next_state_packed, but returns (grid_hash(out), any cell alive, out != packed),
+    all computed during the step instead of in extra passes over the grid.
+    """
+    rem = n % 64
+    last_mask = np.uint64((1 << rem) - 1) if rem else np.uint64(0xFFFFFFFFFFFFFFFF)
+    h, alive, changed = _step_packed(packed, out, last_mask)
+    return int(h), bool(alive), bool(changed)
 
 
 def random_grid(n: int, p: float, rng: np.random.Generator) -> np.ndarray:
@@ -34,8 +213,15 @@ def random_grid(n: int, p: float, rng: np.random.Generator) -> np.ndarray:
 
 
 def grid_hash(grid: np.ndarray) -> int:
-    """Fast-ish hash: view as bytes and hash(). Good enough for cycle detection here."""
+    """
+    64-bit hash of a packed (uint64) grid, computed without a tobytes() copy.
+    Matches the hash step_packed_summary() returns for the same words.
+    Collisions (~2^-64 per pair) are negligible for the few hundred states of a run.
+    Other dtypes fall back to hash() over the bytes.
+    """
     # only compare equality within a run.
+    if grid.dtype == np.uint64 and grid.flags.c_contiguous:
+        return int(_hash_words(grid.reshape(-1)))
     return hash(grid.tobytes())
 
 # ----- Oscillation & still-life detection -----
@@ -45,11 +231,16 @@ class CycleDetector:
     """Tracks recent states to detect repeats. Stores first-seen step per hash."""
     window: int = 200  # large enough for our purposes
     seen: Dict[int, int] = None
-    order: List[int] = None
+    order: Deque[int] = None
+    _bloom: bytearray = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.seen = {}
-        self.order = []
+        self.order = deque(maxlen=self.window)  # appending to a full deque drops the oldest
+        # One flag per low-12-bit hash slot, set on every insert. A clear flag
+        # means h was never recorded, so most new states skip the dict lookup.
+        # Flags are never cleared; an evicted hash only costs a dict probe.
+        self._bloom = bytearray(4096)
 
     def update(self, step: int, h: int) -> Optional[int]:
         """
@@ -58,13 +249,18 @@ class CycleDetector:
         Otherwise return None.
         evict old hashes past the sliding 'window'.
         """
-        if h in self.seen:
-            return step - self.seen[h]
+        slot = h & 0xFFF
+        if self._bloom[slot]:
+            first = self.seen.get(h)
+            if first is not None:
+                return step - first
+        else:
+            self._bloom[slot] = 1
 
         self.seen[h] = step
+        old = self.order[0] if len(self.order) == self.window else None
         self.order.append(h)
-        if len(self.order) > self.window:
-            old = self.order.pop(0)
+        if old is not None:
             # only evict if the stored index matches
             if self.seen.get(old, None) is not None and self.seen[old] < step - self.window:
                 self.seen.pop(old, None)
@@ -91,9 +287,9 @@ def _all_glider_masks() -> List[np.ndarray]:
     phases.append(np.array([[0,0,1],
                             [1,0,1],
                             [0,1,1]], dtype=np.uint8))
-    phases.append(np.array([[0,1,0],
-                            [1,0,1],
-                            [0,1,1]], dtype=np.uint8))
+    phases.append(np.array([[1,0,0],
+                            [0,1,1],
+                            [1,1,0]], dtype=np.uint8))
 
     # Now add rotations (0,90,180,270) and dedupe.
     masks = []
@@ -109,23 +305,35 @@ def _all_glider_masks() -> List[np.ndarray]:
         unique[m.tobytes()] = m
     return list(unique.values())
 
-_GLIDER_MASKS = _all_glider_masks()
+# All masks flattened into one (K, 9) uint8 table, built once at import.
+_MASKS_FLAT = np.stack([m.ravel() for m in _all_glider_masks()])
+
+# Each flattened 3x3 window is encoded as a 9-bit integer (cell k -> bit k);
+# the same encoder builds the mask codes, so both sides always agree.
+_POW2 = (1 << np.arange(9)).astype(np.uint16)
+
+def _window_codes(flat: np.ndarray) -> np.ndarray:
+    """(m, 9) 0/1 rows -> (m,) 9-bit codes."""
+    return flat.dot(_POW2)
+
+_MASK_SET = frozenset(int(c) for c in _window_codes(_MASKS_FLAT))
+
+# Membership table over all 512 codes: a window is a glider iff _MASK_BITMAP[code].
+_MASK_BITMAP = np.zeros(512, dtype=bool)
+_MASK_BITMAP[list(_MASK_SET)] = True
 
 def detect_glider_once(grid: np.ndarray) -> bool:
     """
     Return True if any 3x3 *bounded* window exactly equals a known glider phase.
     (Exact match: the 3x3 must be exactly the mask—no extra live cells.)
+    All windows are encoded in one vectorised pass and looked up in _MASK_BITMAP.
     """
     n = grid.shape[0]
     if n < 3:
         return False
-    for i in range(n - 2):
-        for j in range(n - 2):
-            w = grid[i:i+3, j:j+3]
-            for m in _GLIDER_MASKS:
-                if np.array_equal(w, m):
-                    return True
-    return False
+    W = np.lib.stride_tricks.sliding_window_view(grid, (3, 3))
+    codes = _window_codes(W.reshape(-1, 9))
+    return bool(_MASK_BITMAP[codes].any())
 
 
 # ----- Single-run simulation with event logging -----
@@ -141,13 +349,15 @@ class RunOutcome:
 
 def simulate_once(n: int, p: float, T: int, rng: np.random.Generator) -> RunOutcome:
     g = random_grid(n, p, rng)
+    pg = pack_grid(g)
+    pg_next = np.empty_like(pg)
     cyc = CycleDetector(window=200)
 
     glider_seen = 0
     t_glider: Optional[int] = None
 
-    # treat t=0 as the initial state.
-    h0 = grid_hash(g)
+    # treat t=0 as the initial state (hashes are taken on the packed words).
+    h0 = grid_hash(pg)
     cyc.update(0, h0)
 
     if detect_glider_once(g):
@@ -155,28 +365,27 @@ def simulate_once(n: int, p: float, T: int, rng: np.random.Generator) -> RunOutc
         t_glider = 0
 
     for t in range(1, T+1):
-        g_next = next_state_bounded(g)
+        h, alive, changed = step_packed_summary(pg, n, pg_next)
         # outcomes: extinction
-        if g_next.sum() == 0:
+        if not alive:
             # note: detect glider in the last alive state as well (optional)
             return RunOutcome("extinct", t, None, glider_seen, t_glider)
 
         # still life: next equals current
-        if np.array_equal(g_next, g):
+        if not changed:
             return RunOutcome("still", t, None, glider_seen, t_glider)
 
         # oscillation check via cycle detector
-        h = grid_hash(g_next)
         per = cyc.update(t, h)
         if per is not None and per >= 2:
             return RunOutcome("oscillating", t, per, glider_seen, t_glider)
 
-        # glider detection
-        if glider_seen == 0 and detect_glider_once(g_next):
+        # glider detection (needs the unpacked cells)
+        if glider_seen == 0 and detect_glider_once(unpack_grid(pg_next, n)):
             glider_seen = 1
             t_glider = t
 
-        g = g_next
+        pg, pg_next = pg_next, pg
 
     # If this is reached, we ran out of time without a terminal label.
     # Lets call it "active_end" to mean it neither died, nor froze, nor became periodic within T.
@@ -0,0 +1,86 @@
+# Regression check: the bit-packed step (SWAR kernel with a fused hash) must match
+# the uint8 reference step, and glider detection must find every glider phase.
+# Run with: python -m unittest question6_files/test_life_core.py
+
+import unittest
+
+import numpy as np
+
+try:
+    import question6_files.life_core as L
+except ModuleNotFoundError:
+    import life_core as L
+
+
+def reference_step(grid):
+    # One generation via the uint8 reference kernel.
+    out = np.empty_like(grid)
+    L.next_state_bounded(grid, out)
+    return out
+
+
+def glider_phases():
+    # The 4 phases of one glider, read off by stepping it with the reference kernel
+    # (each phase is the 3x3 bounding box of the live cells).
+    g = np.zeros((12, 12), np.uint8)
+    g[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+    phases = []
+    for _ in range(4):
+        rows, cols = np.nonzero(g)
+        phases.append(g[rows.min():rows.min() + 3, cols.min():cols.min() + 3].copy())
+        g = reference_step(g)
+    return phases
+
+
+class PackedStepMatchesReference(unittest.TestCase):
+    # Widths on both sides of the 64-cell word boundaries, where edge masking matters.
+    WIDTHS = (1, 3, 63, 64, 65, 128, 130)
+
+    def test_next_state_packed(self):
+        rng = np.random.default_rng(0)
+        for n in self.WIDTHS:
+            for p in (0.1, 0.3, 0.5):
+                g = (rng.random((n, n)) < p).astype(np.uint8)
+                packed = L.pack_grid(g)
+                self.assertTrue(np.array_equal(L.unpack_grid(packed, n), g))
+                for _ in range(6):
+                    packed = L.next_state_packed(packed, n)
+                    g = reference_step(g)
+                    self.assertTrue(np.array_equal(L.unpack_grid(packed, n), g), (n, p))
+
+    def test_step_summary(self):
+        rng = np.random.default_rng(1)
+        for n in self.WIDTHS:
+            for p in (0.0, 0.1, 0.4):
+                packed = L.pack_grid((rng.random((n, n)) < p).astype(np.uint8))
+                for _ in range(4):
+                    out = np.empty_like(packed)
+                    h, alive, changed = L.step_packed_summary(packed, n, out)
+                    self.assertEqual(h, L.grid_hash(out))
+                    self.assertEqual(alive, bool(L.unpack_grid(out, n).any()))
+                    self.assertEqual(changed, not np.array_equal(out, packed))
+                    packed = out
+
+
+class GliderDetection(unittest.TestCase):
+    def test_planted_glider_every_rotation(self):
+        for phase in glider_phases():
+            for k in range(4):
+                mask = np.rot90(phase, k)
+                for r, c in ((0, 0), (3, 4), (7, 7)):
+                    g = np.zeros((10, 10), np.uint8)
+                    g[r:r + 3, c:c + 3] = mask
+                    self.assertTrue(L.detect_glider_once(g), (mask.tolist(), r, c))
+
+    def test_no_glider(self):
+        g = np.zeros((10, 10), np.uint8)
+        self.assertFalse(L.detect_glider_once(g))
+        g[4:6, 4:6] = 1  # block (still life)
+        self.assertFalse(L.detect_glider_once(g))
+        g[:] = 0
+        g[4:7, 4:7] = [[0, 1, 0], [1, 0, 1], [0, 1, 1]]  # boat (still life)
+        self.assertFalse(L.detect_glider_once(g))
+
+
+if __name__ == "__main__":
+    unittest.main()